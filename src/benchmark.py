@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of the repository layer on the in-memory SQLite backend, no Postgres needed.
+
+    python src/benchmark.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = ":memory:"
+# SQL logging would drown the output
+os.environ["DATABASE_ECHO"] = "false"
+# required settings that the repository layer doesn't use
+for name in ["TOKEN", "SHEET_ID", "SHEET_NAME", "OPENAI_API_KEY", "POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"]:
+    os.environ.setdefault(name, "benchmark")
+for name in ["CHAT_ID", "ADMIN_CHAT_ID", "MENU_CHANNEL_ID"]:
+    os.environ.setdefault(name, "0")
+
+from database import Recipes, SessionManager, User  # noqa: E402
+from repository import RecipiesRepo, UserRepo  # noqa: E402
+from sqlalchemy import extract, func, select  # noqa: E402
+
+
+async def measure(name: str, call: Callable[[], Awaitable[object]], iterations: int) -> None:
+    await call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / iterations * 1e6:>10.1f} us/call")
+
+
+async def seed(recipes: int, users: int) -> None:
+    await RecipiesRepo.add_recipes(
+        [
+            Recipes(name=f"блюдо {i} {'суп' if i % 10 == 0 else 'каша'}", link=f"https://t.me/{i}")
+            for i in range(recipes)
+        ]
+    )
+    await UserRepo.create_users(
+        [f"@user{i}" for i in range(users)],
+        [f"User {i}" for i in range(users)],
+        [date(1990, 1, 1) + timedelta(days=i) for i in range(users)],
+    )
+
+
+async def compare_statements(iterations: int) -> None:
+    """Per-call overhead of building a new select() every time versus executing the cached statement."""
+    today = datetime(2024, 3, 16)
+    async with SessionManager().get_session_maker()() as session:
+
+        async def count_new() -> object:
+            return (await session.execute(select(func.count(Recipes.id)))).scalar()
+
+        async def count_cached() -> object:
+            return (await session.execute(RecipiesRepo.count_query)).scalar()
+
+        async def search_new() -> object:
+            query = select(Recipes).where(func.lower(Recipes.name).like("%суп%"))
+            return (await session.execute(query)).scalars().all()
+
+        async def search_cached() -> object:
+            return (await session.execute(RecipiesRepo.search_query, {"pattern": "%суп%"})).scalars().all()
+
+        async def birthday_new() -> object:
+            query = select(User).where(
+                extract("day", User.birthday) == today.day, extract("month", User.birthday) == today.month
+            )
+            return (await session.scalars(query)).all()
+
+        async def birthday_cached() -> object:
+            return (await session.scalars(UserRepo.birthday_query, {"day": today.day, "month": today.month})).all()
+
+        await measure("count: new select()", count_new, iterations)
+        await measure("count: cached", count_cached, iterations)
+        await measure("search: new select()", search_new, iterations)
+        await measure("search: cached", search_cached, iterations)
+        await measure("birthday: new select()", birthday_new, iterations)
+        await measure("birthday: cached", birthday_cached, iterations)
+
+
+async def main(iterations: int) -> None:
+    await seed(recipes=2000, users=500)
+    today = datetime(2024, 3, 16)
+
+    await measure("count_recipes", RecipiesRepo.count_recipes, iterations)
+    await measure("search_recipe_by_name", lambda: RecipiesRepo.search_recipe_by_name("суп"), iterations)
+    await measure("get_users_with_birthday", lambda: UserRepo.get_users_with_birthday(today), iterations)
+    await compare_statements(iterations)
+    await SessionManager().engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,39 @@
+from collections import Counter
+from datetime import date
+
+from repository import StatsRepo
+
+
+class ChatActivityCollector:
+    """
+    Aggregates message counts in memory and writes them to the database in batches,
+    so that counting a message never waits for the database.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter[tuple[int, int, date]] = Counter()
+        self._names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, chat_id: int, user_id: int, name: str, day: date) -> None:
+        self._counts[(chat_id, user_id, day)] += 1
+        self._names[user_id] = name
+
+    async def flush(self) -> int:
+        """
+        Write pending counts to the database. Returns the number of upserted rows.
+        """
+        if len(self._counts) == 0:
+            return 0
+        counts, names = self._counts, self._names
+        self._counts, self._names = Counter(), {}
+        try:
+            await StatsRepo.add_message_counts(counts, names)
+        except Exception:
+            # keep the counts for the next flush, messages recorded meanwhile are added on top
+            self._counts.update(counts)
+            self._names = {**names, **self._names}
+            raise
+        return len(counts)
@@ -1,9 +1,13 @@
 from database.base import Base
+from database.chat_stats import ChatStats
+from database.recipes import Recipes
 from database.session_manager import SessionManager
 from database.users import User
 
 __all__ = [
     "User",
     "Base",
+    "ChatStats",
+    "Recipes",
     "SessionManager",
 ]
@@ -0,0 +1,21 @@
+from datetime import date
+
+from database.base import Base
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ChatStats(Base):
+    __tablename__ = "chat_stats"
+
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True, index=True)
+    name: Mapped[str]
+    message_count: Mapped[int] = mapped_column(default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ChatStats(chat_id={self.chat_id}, user_id={self.user_id}, day={self.day}, "
+            f"name={self.name}, message_count={self.message_count})>"
+        )
@@ -1,7 +1,11 @@
+import asyncio
 from functools import wraps
 
+from database.base import Base
 from settings import Settings
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
 
 class SessionManager:
@@ -11,7 +15,9 @@ class SessionManager:
     """
 
     def __init__(self) -> None:
-        self.refresh()
+        # __init__ runs on every SessionManager() call, the engine has to be created only once
+        if not hasattr(self, "engine"):
+            self.refresh()
 
     def __new__(cls) -> "SessionManager":
         if not hasattr(cls, "instance"):
@@ -19,16 +25,66 @@ class SessionManager:
         return cls.instance
 
     def get_session_maker(self) -> async_sessionmaker[AsyncSession]:
-        return async_sessionmaker(self.engine, expire_on_commit=False)
+        return self.session_maker
 
     def refresh(self) -> None:
-        self.engine = create_async_engine(Settings().database_uri, echo=True, future=True)
+        settings = Settings()
+        if settings.database_backend == "sqlite" and settings.sqlite_path == ":memory:":
+            # every new connection would get its own empty in-memory database, so all sessions share one
+            self.engine = create_async_engine(
+                settings.database_uri,
+                echo=settings.database_echo,
+                poolclass=StaticPool,
+                query_cache_size=settings.database_query_cache_size,
+            )
+        elif settings.database_backend == "sqlite":
+            self.engine = create_async_engine(
+                settings.database_uri,
+                echo=settings.database_echo,
+                query_cache_size=settings.database_query_cache_size,
+            )
+        else:
+            self.engine = create_async_engine(
+                settings.database_uri,
+                echo=settings.database_echo,
+                future=True,
+                query_cache_size=settings.database_query_cache_size,
+                connect_args={"prepared_statement_cache_size": settings.database_prepared_statement_cache_size},
+            )
+        if settings.database_backend == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", _register_sqlite_functions)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        # Postgres schema is managed by alembic, SQLite schema is created on first use
+        self.schema_created = settings.database_backend != "sqlite"
+        self._schema_lock = asyncio.Lock()
+
+    async def create_schema(self) -> None:
+        """
+        Create all tables from the models.
+        """
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        self.schema_created = True
+
+    async def ensure_schema(self) -> None:
+        if self.schema_created:
+            return
+        async with self._schema_lock:
+            if not self.schema_created:
+                await self.create_schema()
+
+
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # built-in lower() of SQLite only handles ASCII, recipe names are mostly cyrillic
+    dbapi_connection.create_function("lower", 1, lambda value: value.lower() if value is not None else None)
 
 
 def with_async_session(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        session_maker = SessionManager().get_session_maker()
+        manager = SessionManager()
+        await manager.ensure_schema()
+        session_maker = manager.get_session_maker()
         async with session_maker() as session:
             try:
                 return await func(*args, session=session, **kwargs)
@@ -1,28 +1,56 @@
+import asyncio
 import html
 import json
 import random
 import traceback
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 
+import profiling
 import pytz
+from chat_activity import ChatActivityCollector
 from llm import LLM
 from logger import get_logger
+from pagination import PAGE_CALLBACK_PREFIX, PageCache, page_keyboard
+from rate_limit import RateLimiter, parse_command
 from read_recipes import parse_recipes
-from repository import RecipiesRepo, UserRepo
+from recipe_index import RecipeIndex
+from repository import RecipiesRepo, StatsRepo, UserRepo
 from settings import Settings
-from telegram import ChatMember, ChatMemberUpdated, Update
+from telegram import Bot, ChatMember, ChatMemberUpdated, InlineQueryResultArticle, InputTextMessageContent, Update
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 from telegram.ext import (
     Application,
+    ApplicationHandlerStop,
+    CallbackQueryHandler,
     ChatMemberHandler,
     CommandHandler,
     ContextTypes,
+    InlineQueryHandler,
+    MessageHandler,
+    filters,
 )
+from telegram_requests import build_request, warm_up
 from texts import HELP_TEXT, JOIN_MESSAGE, MENU_TEXT, SUPPORTIVE_PHRASES, USER_SUPPORTIVE
 from utils import escape_markdown, update_table
 
 logger = get_logger(__name__)
 settings = Settings()
+# scheduled and admin messages go through their own connection pool, so they don't delay replies to users
+bulk_bot = Bot(settings.token, request=build_request(settings, settings.telegram_bulk_pool_size))
+recipe_index = RecipeIndex(
+    settings.inline_max_results,
+    settings.inline_results_cache_size,
+    settings.inline_results_cache_ttl,
+)
+recipe_pages = PageCache(settings.search_results_cache_size, settings.search_results_cache_ttl)
+chat_activity = ChatActivityCollector()
+rate_limiter = RateLimiter(
+    settings.rate_limit_user_capacity,
+    settings.rate_limit_user_rate,
+    settings.rate_limit_chat_capacity,
+    settings.rate_limit_chat_rate,
+)
 
 
 async def check_birthdays(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -31,10 +59,10 @@ async def check_birthdays(context: ContextTypes.DEFAULT_TYPE) -> None:
     birthday_users = await UserRepo.get_users_with_birthday(datetime.now(pytz.timezone(settings.timezone)))
 
     if len(birthday_users) == 0:
-        await context.bot.send_message(settings.admin_chat_id, text="No birthdays today")
+        await bulk_bot.send_message(settings.admin_chat_id, text="No birthdays today")
         return
     for user in birthday_users:
-        await context.bot.send_message(
+        await bulk_bot.send_message(
             settings.chat_id,
             text=f"Самое время поздравить {user.username} с Днём Рождения!🎉✨",
         )
@@ -45,7 +73,7 @@ async def send_horoscope(context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.info("Sending horoscope")
     horoscope = LLM.generate_horoscope()
 
-    await context.bot.send_message(
+    await bulk_bot.send_message(
         settings.chat_id,
         text=horoscope,
         parse_mode=ParseMode.MARKDOWN,
@@ -106,7 +134,7 @@ async def greet_chat_members(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         logger.info(f"New member {member_username}")
     elif was_member and not is_member:
-        await context.bot.send_message(
+        await bulk_bot.send_message(
             settings.admin_chat_id,
             text=f"{member_username} покинул чат",
         )
@@ -130,7 +158,7 @@ async def sync_birthdays_table(context: ContextTypes.DEFAULT_TYPE) -> None:
             ", ".join(user.username for user in removed_users),
         )
     )
-    await context.bot.send_message(settings.admin_chat_id, text=f"Synced table. Created {len(users)} users")
+    await bulk_bot.send_message(settings.admin_chat_id, text=f"Synced table. Created {len(users)} users")
 
 
 async def find_recipe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -139,14 +167,74 @@ async def find_recipe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         await update.message.reply_text("Введите название блюда")
         return
 
-    dish_name = " ".join(context.args)
-    logger.info(f"Search recipe by name {dish_name}")
-    recipes = await RecipiesRepo.search_recipe_by_name(dish_name)
-    if len(recipes) == 0:
+    dish_name = " ".join(context.args).lower()
+    key = recipe_pages.make_key(dish_name)
+    pages = recipe_pages.get(key)
+    if pages is None:
+        logger.info(f"Search recipe by name {dish_name}")
+        recipes = await RecipiesRepo.search_recipe_by_name(dish_name)
+        recipes = sorted(
+            recipes, key=lambda recipe: (not recipe.name.lower().startswith(dish_name), recipe.name.lower())
+        )
+        lines = [rf"\- [{escape_markdown(recipe.name)}]({recipe.link})" for recipe in recipes]
+        pages = recipe_pages.put(key, lines, settings.search_page_size)
+    if len(pages) == 0:
         await update.message.reply_text("Рецепт не найден")
         return
-    response_text = "\n".join(rf"\- [{escape_markdown(recipe.name)}]({recipe.link})" for recipe in recipes)
-    await update.message.reply_text(response_text, parse_mode=ParseMode.MARKDOWN_V2)
+    await update.message.reply_text(
+        pages[0],
+        parse_mode=ParseMode.MARKDOWN_V2,
+        reply_markup=page_keyboard(key, 0, len(pages)),
+    )
+
+
+async def flip_recipes_page(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Show another page of cached search results."""
+    callback_query = update.callback_query
+    if callback_query is None or callback_query.data is None:
+        return
+    _, key, page_str = callback_query.data.split(":")
+    pages = recipe_pages.get(key)
+    page = int(page_str)
+    if pages is None or page >= len(pages):
+        await callback_query.answer("Результаты устарели, повторите поиск")
+        return
+    await callback_query.answer()
+    try:
+        await callback_query.edit_message_text(
+            pages[page],
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=page_keyboard(key, page, len(pages)),
+        )
+    except BadRequest as e:
+        # a double tap sends the same page twice, the second edit changes nothing
+        if "not modified" not in e.message:
+            raise
+
+
+async def inline_find_recipe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer `@bot name` inline queries from the in-memory recipe index."""
+    inline_query = update.inline_query
+    if inline_query is None:
+        return
+
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    recipes = recipe_index.search(inline_query.query, settings.inline_latency_budget)
+    page = recipes[offset : offset + settings.inline_page_size]
+    next_offset = str(offset + len(page)) if offset + len(page) < len(recipes) else ""
+    await inline_query.answer(
+        [
+            InlineQueryResultArticle(
+                id=str(recipe.id),
+                title=recipe.name,
+                url=recipe.link,
+                input_message_content=InputTextMessageContent(f"{recipe.name} {recipe.link}"),
+            )
+            for recipe in page
+        ],
+        cache_time=settings.inline_cache_time,
+        next_offset=next_offset,
+    )
 
 
 async def ping(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -170,11 +258,13 @@ async def create_recipe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     dish_name = " ".join(context.args)
     message_url = f"https://t.me/c/1563220312/{update.message.reply_to_message.message_id}"
-    await context.bot.send_message(
+    await bulk_bot.send_message(
         settings.menu_channel_id, text=f"{message_url} {dish_name}", parse_mode=ParseMode.MARKDOWN
     )
     logger.info(f"Menu sent {message_url} {dish_name}")
-    await RecipiesRepo.add_recipe(dish_name, message_url)
+    recipe = await RecipiesRepo.add_recipe(dish_name, message_url)
+    recipe_index.add(recipe)
+    recipe_pages.clear()
     await update.message.reply_text("Menu sent")
 
 
@@ -208,6 +298,63 @@ async def send_support_message(update: Update, context: ContextTypes.DEFAULT_TYP
     await update.message.reply_text(SUPPORTIVE_PHRASES[random.randint(0, len(SUPPORTIVE_PHRASES) - 1)])
 
 
+async def limit_commands(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Drop commands that exceed the per-user or per-chat rate limit before other handlers run."""
+    # effective_message, because command handlers also run on edited messages
+    message = update.effective_message
+    if message is None or message.text is None or update.effective_user is None:
+        return
+    command = parse_command(message.text, context.bot.username)
+    if command is None:
+        return
+    if not rate_limiter.allow(command, update.effective_user.id, message.chat.id):
+        logger.debug(f"Rate limited /{command} from {update.effective_user.id} in {message.chat.id}")
+        raise ApplicationHandlerStop
+
+
+async def show_rate_limits(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.message is None:
+        return
+    if len(rate_limiter.rejections) == 0:
+        await update.message.reply_text("No rate limited commands")
+        return
+    lines = [f"/{command} ({scope}): {count}" for (command, scope), count in rate_limiter.rejections.most_common()]
+    await update.message.reply_text("Rate limited commands:\n" + "\n".join(lines))
+
+
+async def start_profiling(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Profile the event loop for N seconds in the background and send the report to the admin chat."""
+    if update.message is None:
+        return
+    seconds = float(context.args[0]) if context.args and context.args[0].isdigit() else settings.profile_default_seconds
+    seconds = min(seconds, settings.profile_max_seconds)
+    # reserved before any await, so that two quick /profile calls can't both start
+    if not profiling.reserve():
+        await update.message.reply_text("Profiling is already running")
+        return
+    # handlers run one at a time, so waiting here would block every other update
+    context.application.create_task(send_profile_report(context, seconds), update=update)
+    await update.message.reply_text(
+        f"Watching for slow callbacks for {seconds / 2:g} seconds, then profiling for {seconds / 2:g} seconds"
+    )
+
+
+async def send_profile_report(context: ContextTypes.DEFAULT_TYPE, seconds: float) -> None:
+    report = await profiling.profile_event_loop(seconds, settings.profile_slow_callback_duration)
+    slow_callbacks = "\n".join(report.slow_callbacks) if report.slow_callbacks else "none"
+    message = (
+        f"<pre>{html.escape(report.summary[: settings.profile_summary_length])}</pre>\n\n"
+        f"Loop blocked longer than {settings.profile_slow_callback_duration}s:\n"
+        f"<pre>{html.escape(slow_callbacks[: settings.profile_summary_length])}</pre>"
+    )
+    await bulk_bot.send_message(settings.admin_chat_id, text=message, parse_mode=ParseMode.HTML)
+    await bulk_bot.send_document(
+        settings.admin_chat_id,
+        document=report.profile,
+        filename=f"profile_{datetime.now():%Y%m%d_%H%M%S}.prof",
+    )
+
+
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log the error and send a telegram message to notify the developer."""
     # https://github.com/python-telegram-bot/python-telegram-bot/blob/master/examples/errorhandlerbot.py
@@ -225,7 +372,50 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
         f"<pre>context.user_data = {html.escape(str(context.user_data))}</pre>\n\n"
         f"<pre>{html.escape(tb_string)}</pre>"
     )
-    await context.bot.send_message(settings.admin_chat_id, text=message, parse_mode=ParseMode.HTML)
+    await bulk_bot.send_message(settings.admin_chat_id, text=message, parse_mode=ParseMode.HTML)
+
+
+async def collect_chat_activity(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Count the message in memory, counts are written to the database by `flush_chat_activity`."""
+    if update.message is None or update.effective_user is None:
+        return
+    chat_activity.record(
+        update.message.chat.id,
+        update.effective_user.id,
+        update.effective_user.full_name,
+        update.message.date.astimezone(pytz.timezone(settings.timezone)).date(),
+    )
+
+
+async def flush_chat_activity(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Write aggregated chat activity to the database."""
+    rows = await chat_activity.flush()
+    if rows > 0:
+        logger.info(f"Flushed {rows} chat activity rows")
+
+
+async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.message is None or update.effective_user is None:
+        return
+    await chat_activity.flush()
+    today = datetime.now(pytz.timezone(settings.timezone)).date()
+    today_count, total_count = await StatsRepo.get_user_stats(settings.chat_id, update.effective_user.id, today)
+    await update.message.reply_text(f"Сообщений сегодня: {today_count}\nВсего сообщений: {total_count}")
+
+
+async def show_top_chatters(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.message is None:
+        return
+    days = int(context.args[0]) if context.args and context.args[0].isdigit() else 7
+    days = min(max(days, 1), 365)
+    await chat_activity.flush()
+    since = datetime.now(pytz.timezone(settings.timezone)).date() - timedelta(days=days - 1)
+    top = await StatsRepo.get_top_chatters(settings.chat_id, since, settings.stats_top_limit)
+    if len(top) == 0:
+        await update.message.reply_text("Пока нет статистики")
+        return
+    lines = [f"{place}. {name} - {count}" for place, (name, count) in enumerate(top, start=1)]
+    await update.message.reply_text(f"Самые активные за {days} дн.:\n" + "\n".join(lines))
 
 
 # async def good_morning(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -233,6 +423,7 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
 
 
 def add_handlers(application: Application) -> None:
+    application.add_handler(MessageHandler(filters.COMMAND, limit_commands), group=-1)
     application.add_handler(ChatMemberHandler(greet_chat_members, ChatMemberHandler.CHAT_MEMBER))
     application.add_handler(CommandHandler("menu", create_recipe))
     application.add_handler(CommandHandler("add_recipe", create_recipe))
@@ -240,7 +431,27 @@ def add_handlers(application: Application) -> None:
     application.add_handler(CommandHandler("show_menu", show_menu))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("search_recipe", find_recipe))
+    application.add_handler(CallbackQueryHandler(flip_recipes_page, pattern=rf"^{PAGE_CALLBACK_PREFIX}:"))
+    application.add_handler(InlineQueryHandler(inline_find_recipe))
+    # activity is only collected in the main chat, so the stats make no sense anywhere else
+    application.add_handler(CommandHandler("stats", show_stats, filters=filters.Chat(settings.chat_id)))
+    application.add_handler(CommandHandler("top", show_top_chatters, filters=filters.Chat(settings.chat_id)))
+    application.add_handler(
+        CommandHandler("rate_limits", show_rate_limits, filters=filters.Chat(settings.admin_chat_id))
+    )
+    application.add_handler(CommandHandler("profile", start_profiling, filters=filters.Chat(settings.admin_chat_id)))
     # application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, send_support_message))
+    # separate group, so that counting runs alongside the command handlers above
+    application.add_handler(
+        MessageHandler(filters.Chat(settings.chat_id) & filters.UpdateType.MESSAGE, collect_chat_activity),
+        group=1,
+    )
+    rate_limiter.commands = {
+        command
+        for handler in application.handlers[0]
+        if isinstance(handler, CommandHandler)
+        for command in handler.commands
+    }
 
 
 def add_jobs(application: Application, time_zone_str: str) -> None:
@@ -249,6 +460,7 @@ def add_jobs(application: Application, time_zone_str: str) -> None:
         raise ValueError("Job queue is None")
     application.job_queue.run_daily(sync_birthdays_table, time=time(8, tzinfo=time_zone))
     application.job_queue.run_daily(check_birthdays, time=time(9, tzinfo=time_zone))
+    application.job_queue.run_repeating(flush_chat_activity, interval=settings.stats_flush_interval)
     # application.job_queue.run_daily(good_morning, time=time(8, tzinfo=time_zone))
     # application.job_queue.run_daily(send_horoscope, time=time(8, 30, tzinfo=time_zone))
 
@@ -260,11 +472,35 @@ async def update_recipes_table(application: Application) -> None:
         await RecipiesRepo.add_recipes(recipes)
 
 
+async def post_init(application: Application) -> None:
+    await update_recipes_table(application)
+    await recipe_index.load()
+    logger.info(f"Loaded {len(recipe_index)} recipes into search index")
+    await bulk_bot.initialize()
+    await asyncio.gather(
+        warm_up(application.bot, min(settings.telegram_warmup_connections, settings.telegram_replies_pool_size)),
+        warm_up(bulk_bot, min(settings.telegram_warmup_connections, settings.telegram_bulk_pool_size)),
+    )
+
+
+async def post_shutdown(application: Application) -> None:
+    await chat_activity.flush()
+    await bulk_bot.shutdown()
+
+
 def main() -> None:
     """Start the bot."""
     logger.info("start bot")
 
-    application = Application.builder().token(settings.token).post_init(update_recipes_table).build()
+    application = (
+        Application.builder()
+        .token(settings.token)
+        .request(build_request(settings, settings.telegram_replies_pool_size))
+        .get_updates_request(build_request(settings, settings.telegram_updates_pool_size))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     add_handlers(application)
     add_jobs(application, settings.timezone)
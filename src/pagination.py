@@ -0,0 +1,67 @@
+import hashlib
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import MessageLimit
+from utils import TTLCache
+
+PAGE_CALLBACK_PREFIX = "recipes"
+# room left in every page for the "page N/M" footer
+FOOTER_RESERVE = 32
+
+
+def split_pages(lines: list[str], page_size: int, limit: int = MessageLimit.MAX_TEXT_LENGTH) -> list[list[str]]:
+    """
+    Group lines into pages of at most `page_size` lines that fit into one telegram message.
+    """
+    pages: list[list[str]] = []
+    page: list[str] = []
+    length = 0
+    for line in lines:
+        if len(page) > 0 and (len(page) == page_size or length + len(line) + 1 > limit - FOOTER_RESERVE):
+            pages.append(page)
+            page, length = [], 0
+        page.append(line)
+        length += len(line) + 1
+    if len(page) > 0:
+        pages.append(page)
+    return pages
+
+
+class PageCache:
+    """
+    Keeps rendered result pages per search query, so that page flips are served from memory.
+    Pages are stored under a short key that fits into callback data.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache: TTLCache[str, list[str]] = TTLCache(maxsize, ttl)
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        return hashlib.blake2b(query.encode(), digest_size=6).hexdigest()
+
+    def get(self, key: str) -> list[str] | None:
+        return self._cache.get(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def put(self, key: str, lines: list[str], page_size: int) -> list[str]:
+        pages = split_pages(lines, page_size)
+        rendered = [
+            "\n".join(page) + (f"\n\nСтраница {number}/{len(pages)}" if len(pages) > 1 else "")
+            for number, page in enumerate(pages, start=1)
+        ]
+        self._cache.set(key, rendered)
+        return rendered
+
+
+def page_keyboard(key: str, page: int, total: int) -> InlineKeyboardMarkup | None:
+    if total <= 1:
+        return None
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("◀️", callback_data=f"{PAGE_CALLBACK_PREFIX}:{key}:{page - 1}"))
+    if page < total - 1:
+        buttons.append(InlineKeyboardButton("▶️", callback_data=f"{PAGE_CALLBACK_PREFIX}:{key}:{page + 1}"))
+    return InlineKeyboardMarkup([buttons])
@@ -0,0 +1,116 @@
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+
+
+@dataclass
+class ProfileReport:
+    summary: str
+    slow_callbacks: list[str]
+    profile: bytes
+
+
+class _LoopWatchdog(threading.Thread):
+    """
+    Detects callbacks that block the event loop without asyncio debug mode.
+    A task on the loop updates a heartbeat, and when it goes stale the thread captures the loop thread's stack.
+    """
+
+    def __init__(self, loop_thread_id: int, threshold: float, max_records: int) -> None:
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.threshold = threshold
+        self.interval = threshold / 4
+        self.max_records = max_records
+        self.heartbeat = time.monotonic()
+        self.records: list[str] = []
+        self._stopped = threading.Event()
+
+    async def beat(self) -> None:
+        while True:
+            self.heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def run(self) -> None:
+        stall_stack: str | None = None
+        stall_duration = 0.0
+        while not self._stopped.wait(self.interval):
+            # the heartbeat is expected to be `interval` old, everything above that is time the loop was blocked
+            blocked = time.monotonic() - self.heartbeat - self.interval
+            if blocked >= self.threshold:
+                if stall_stack is None:
+                    frame = sys._current_frames().get(self.loop_thread_id)
+                    stall_stack = "".join(traceback.format_stack(frame)[-6:]) if frame is not None else ""
+                stall_duration = blocked
+            elif stall_stack is not None:
+                self._add_record(stall_duration, stall_stack)
+                stall_stack = None
+        if stall_stack is not None:
+            self._add_record(stall_duration, stall_stack)
+
+    def _add_record(self, duration: float, stack: str) -> None:
+        if len(self.records) < self.max_records:
+            self.records.append(f"Loop blocked for at least {duration:.3f} seconds in:\n{stack}")
+
+
+_running = False
+
+
+def reserve() -> bool:
+    """
+    Mark the profiler as busy before scheduling `profile_event_loop`, which releases it when done.
+    Returns False if profiling is already running.
+    """
+    global _running
+    if _running:
+        return False
+    _running = True
+    return True
+
+
+async def profile_event_loop(
+    seconds: float, slow_callback_duration: float, top: int = 30, max_slow_callbacks: int = 10
+) -> ProfileReport:
+    """
+    Spend the first half of `seconds` watching the event loop for callbacks that block it longer than
+    `slow_callback_duration`, and the second half profiling it with cProfile. The windows are separate,
+    so that profiler overhead doesn't inflate the measured callback durations.
+    """
+    global _running
+    window = seconds / 2
+    try:
+        watchdog = _LoopWatchdog(threading.get_ident(), slow_callback_duration, max_slow_callbacks)
+        heartbeat = asyncio.create_task(watchdog.beat())
+        watchdog.start()
+        try:
+            await asyncio.sleep(window)
+        finally:
+            heartbeat.cancel()
+            watchdog.stop()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(window)
+        finally:
+            profiler.disable()
+    finally:
+        _running = False
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    # same format as `pstats.Stats.dump_stats`, so the file can be opened with snakeviz or pstats
+    profile = marshal.dumps(pstats.Stats(profiler).stats)  # type: ignore[attr-defined]
+    return ProfileReport(summary=stream.getvalue(), slow_callbacks=watchdog.records, profile=profile)
@@ -0,0 +1,93 @@
+import time
+from collections import Counter
+
+
+def parse_command(text: str, bot_username: str) -> str | None:
+    """
+    Extract the lowercased command name from a message text like "/cmd@bot args".
+    Returns None if the command is addressed to another bot, no handler runs for it then.
+    """
+    command, _, username = text.split(maxsplit=1)[0][1:].partition("@")
+    if username and username.lower() != bot_username.lower():
+        return None
+    return command.lower()
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float, now: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def consume(self, now: float) -> bool:
+        self.refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """
+    Per-user and per-chat token buckets for bot commands.
+    Everything is kept in memory, so rejected commands never reach the database or telegram.
+    """
+
+    def __init__(
+        self,
+        user_capacity: float,
+        user_rate: float,
+        chat_capacity: float,
+        chat_rate: float,
+        max_buckets: int = 10_000,
+    ) -> None:
+        self.user_capacity = user_capacity
+        self.user_rate = user_rate
+        self.chat_capacity = chat_capacity
+        self.chat_rate = chat_rate
+        self.max_buckets = max_buckets
+        self.commands: set[str] = set()
+        self.rejections: Counter[tuple[str, str]] = Counter()
+        self._user_buckets: dict[int, TokenBucket] = {}
+        self._chat_buckets: dict[int, TokenBucket] = {}
+
+    def allow(self, command: str, user_id: int, chat_id: int, now: float | None = None) -> bool:
+        if command not in self.commands:
+            return True
+        now = time.monotonic() if now is None else now
+        user_bucket = self._get_bucket(self._user_buckets, user_id, self.user_capacity, self.user_rate, now)
+        if not user_bucket.consume(now):
+            self.rejections[(command, "user")] += 1
+            return False
+        chat_bucket = self._get_bucket(self._chat_buckets, chat_id, self.chat_capacity, self.chat_rate, now)
+        if not chat_bucket.consume(now):
+            # the command was not executed, so the user should not pay for it
+            user_bucket.tokens += 1
+            self.rejections[(command, "chat")] += 1
+            return False
+        return True
+
+    def _get_bucket(
+        self, buckets: dict[int, TokenBucket], key: int, capacity: float, rate: float, now: float
+    ) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_buckets:
+                self._drop_idle(buckets, now)
+            bucket = buckets[key] = TokenBucket(capacity, rate, now)
+        return bucket
+
+    @staticmethod
+    def _drop_idle(buckets: dict[int, TokenBucket], now: float) -> None:
+        """Forget buckets that are full again, a new bucket for them would behave the same."""
+        for key, bucket in list(buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del buckets[key]
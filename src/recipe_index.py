@@ -0,0 +1,102 @@
+import bisect
+import difflib
+import time
+
+from database.recipes import Recipes
+from repository import RecipiesRepo
+from utils import TTLCache
+
+
+class RecipeIndex:
+    """
+    In-memory index over recipe names for as-you-type search.
+    It is loaded once on startup and updated when recipes are added, so lookups never touch the database.
+    """
+
+    fuzzy_cutoff = 0.7
+    # how many names are scanned between deadline checks
+    check_every = 128
+
+    def __init__(self, max_results: int, cache_size: int, cache_ttl: float) -> None:
+        self.max_results = max_results
+        self._names: list[str] = []
+        self._recipes: list[Recipes] = []
+        self._cache: TTLCache[str, list[Recipes]] = TTLCache(cache_size, cache_ttl)
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    async def load(self) -> None:
+        recipes = sorted(await RecipiesRepo.get_all_recipes(), key=lambda recipe: recipe.name.lower())
+        self._names = [recipe.name.lower() for recipe in recipes]
+        self._recipes = recipes
+        self._cache.clear()
+
+    def add(self, recipe: Recipes) -> None:
+        name = recipe.name.lower()
+        position = bisect.bisect_right(self._names, name)
+        self._names.insert(position, name)
+        self._recipes.insert(position, recipe)
+        self._cache.clear()
+
+    def search(self, query: str, budget: float) -> list[Recipes]:
+        """
+        Rank recipes by prefix, word prefix and substring matches, falling back to fuzzy matching
+        when nothing matches exactly. Stops after `budget` seconds and returns what was found so far.
+        """
+        query = " ".join(query.lower().split())
+        if len(query) == 0:
+            return []
+        cached = self._cache.get(query)
+        if cached is not None:
+            return cached
+
+        deadline = time.perf_counter() + budget
+        results, complete = self._match(query, deadline)
+        if len(results) == 0 and complete:
+            results, complete = self._fuzzy_match(query, deadline)
+        results = results[: self.max_results]
+        # partial results are not cached so that the next keystroke gets a chance to finish the scan
+        if complete:
+            self._cache.set(query, results)
+        return results
+
+    def _match(self, query: str, deadline: float) -> tuple[list[Recipes], bool]:
+        start = bisect.bisect_left(self._names, query)
+        end = bisect.bisect_right(self._names, query + "\uffff", lo=start)
+        prefix = self._recipes[start:end]
+
+        word_prefix: list[Recipes] = []
+        substring: list[Recipes] = []
+        for i, name in enumerate(self._names):
+            if i % self.check_every == 0 and time.perf_counter() > deadline:
+                return prefix + word_prefix + substring, False
+            if start <= i < end:
+                continue
+            if " " + query in name:
+                word_prefix.append(self._recipes[i])
+            elif query in name:
+                substring.append(self._recipes[i])
+        return prefix + word_prefix + substring, True
+
+    def _fuzzy_match(self, query: str, deadline: float) -> tuple[list[Recipes], bool]:
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(query)
+        scored: list[tuple[float, int]] = []
+        complete = True
+        for i, name in enumerate(self._names):
+            if i % self.check_every == 0 and time.perf_counter() > deadline:
+                complete = False
+                break
+            best = 0.0
+            for word in (name, *name.split()):
+                matcher.set_seq1(word)
+                if matcher.real_quick_ratio() < self.fuzzy_cutoff or matcher.quick_ratio() < self.fuzzy_cutoff:
+                    continue
+                ratio = matcher.ratio()
+                if ratio >= self.fuzzy_cutoff:
+                    best = max(best, ratio)
+            if best > 0:
+                scored.append((best, i))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [self._recipes[i] for _, i in scored], complete
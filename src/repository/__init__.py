@@ -1,7 +1,9 @@
 from repository.recipes import RecipiesRepo
+from repository.stats import StatsRepo
 from repository.user import UserRepo
 
 __all__ = [
     "RecipiesRepo",
+    "StatsRepo",
     "UserRepo",
 ]
@@ -1,10 +1,14 @@
 from database.recipes import Recipes
 from database.session_manager import with_async_session
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class RecipiesRepo:
+    # hot queries are built once and executed with bound parameters
+    count_query = select(func.count(Recipes.id))
+    search_query = select(Recipes).where(func.lower(Recipes.name).like(bindparam("pattern")))
+
     @staticmethod
     @with_async_session
     async def add_recipe(name: str, link: str, session: AsyncSession) -> Recipes:
@@ -23,11 +27,16 @@ class RecipiesRepo:
     @staticmethod
     @with_async_session
     async def count_recipes(session: AsyncSession) -> int:
-        query = select(func.count(Recipes.id))
-        return (await session.execute(query)).scalar()
+        return (await session.execute(RecipiesRepo.count_query)).scalar()
 
     @staticmethod
     @with_async_session
-    async def search_recipe_by_name(name: str, session: AsyncSession) -> list[Recipes]:
-        query = select(Recipes).where(Recipes.name.like(f"%{name.lower()}%"))
+    async def get_all_recipes(session: AsyncSession) -> list[Recipes]:
+        query = select(Recipes)
         return (await session.execute(query)).scalars().all()
+
+    @staticmethod
+    @with_async_session
+    async def search_recipe_by_name(name: str, session: AsyncSession) -> list[Recipes]:
+        pattern = f"%{name.lower()}%"
+        return (await session.execute(RecipiesRepo.search_query, {"pattern": pattern})).scalars().all()
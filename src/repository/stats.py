@@ -0,0 +1,76 @@
+from datetime import date
+
+from database.chat_stats import ChatStats
+from database.session_manager import with_async_session
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class StatsRepo:
+    @staticmethod
+    @with_async_session
+    async def add_message_counts(
+        counts: dict[tuple[int, int, date], int], names: dict[int, str], session: AsyncSession
+    ) -> None:
+        """
+        Add aggregated message counts keyed by (chat_id, user_id, day) in one batched upsert.
+        """
+        insert = sqlite.insert if session.bind.dialect.name == "sqlite" else postgresql.insert
+        query = insert(ChatStats).values(
+            [
+                {"chat_id": chat_id, "user_id": user_id, "day": day, "name": names[user_id], "message_count": count}
+                for (chat_id, user_id, day), count in counts.items()
+            ]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[ChatStats.chat_id, ChatStats.user_id, ChatStats.day],
+            set_={
+                "name": query.excluded.name,
+                "message_count": ChatStats.message_count + query.excluded.message_count,
+            },
+        )
+        await session.execute(query)
+        await session.commit()
+
+    @staticmethod
+    @with_async_session
+    async def get_user_stats(chat_id: int, user_id: int, today: date, session: AsyncSession) -> tuple[int, int]:
+        """
+        Get the number of messages sent by the user today and in total.
+        """
+        query = select(
+            func.coalesce(func.sum(ChatStats.message_count).filter(ChatStats.day == today), 0),
+            func.coalesce(func.sum(ChatStats.message_count), 0),
+        ).where(ChatStats.chat_id == chat_id, ChatStats.user_id == user_id)
+        today_count, total_count = (await session.execute(query)).one()
+        return today_count, total_count
+
+    @staticmethod
+    @with_async_session
+    async def get_top_chatters(chat_id: int, since: date, limit: int, session: AsyncSession) -> list[tuple[str, int]]:
+        totals = (
+            select(
+                ChatStats.user_id,
+                func.sum(ChatStats.message_count).label("total"),
+                func.max(ChatStats.day).label("last_day"),
+            )
+            .where(ChatStats.chat_id == chat_id, ChatStats.day >= since)
+            .group_by(ChatStats.user_id)
+            .subquery()
+        )
+        # the name is taken from the latest day, users can rename themselves
+        query = (
+            select(ChatStats.name, totals.c.total)
+            .join(
+                totals,
+                and_(
+                    ChatStats.chat_id == chat_id,
+                    ChatStats.user_id == totals.c.user_id,
+                    ChatStats.day == totals.c.last_day,
+                ),
+            )
+            .order_by(totals.c.total.desc())
+            .limit(limit)
+        )
+        return [(name, count) for name, count in (await session.execute(query)).all()]
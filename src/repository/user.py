@@ -2,11 +2,15 @@ from datetime import datetime
 
 from database import User
 from database.session_manager import with_async_session
-from sqlalchemy import delete, extract, select
+from sqlalchemy import bindparam, delete, extract, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class UserRepo:
+    birthday_query = select(User).where(
+        extract("day", User.birthday) == bindparam("day"), extract("month", User.birthday) == bindparam("month")
+    )
+
     @staticmethod
     @with_async_session
     async def create_user(username: str, nickname: str, birthday: datetime, session: AsyncSession) -> User:
@@ -36,13 +40,8 @@ class UserRepo:
     @staticmethod
     @with_async_session
     async def get_users_with_birthday(birthday: datetime, session: AsyncSession) -> list[User]:
-        return (
-            await session.scalars(
-                select(User).where(
-                    extract("day", User.birthday) == birthday.day, extract("month", User.birthday) == birthday.month
-                )
-            )
-        ).all()  # type: ignore
+        params = {"day": birthday.day, "month": birthday.month}
+        return (await session.scalars(UserRepo.birthday_query, params)).all()  # type: ignore
 
     @staticmethod
     @with_async_session
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -12,6 +12,26 @@ class Settings(BaseSettings):
     admin_chat_id: int
     menu_channel_id: int
 
+    # separate connection pools, so that a burst of sends can't starve update fetching
+    telegram_updates_pool_size: int = Field(default=1)
+    telegram_replies_pool_size: int = Field(default=8)
+    telegram_bulk_pool_size: int = Field(default=4)
+    telegram_warmup_connections: int = Field(default=2)
+    telegram_connect_timeout: float = Field(default=5)
+    telegram_read_timeout: float = Field(default=5)
+    telegram_write_timeout: float = Field(default=5)
+    telegram_pool_timeout: float = Field(default=3)
+    telegram_keepalive_expiry: float = Field(default=60)
+
+    # "sqlite" runs on aiosqlite, by default in memory with the schema created from the models
+    database_backend: Literal["postgres", "sqlite"] = Field(default="postgres")
+    sqlite_path: str = Field(default=":memory:")
+
+    database_echo: bool = Field(default=True)
+    # compiled SQL cache of the engine and prepared statement cache of every asyncpg connection
+    database_query_cache_size: int = Field(default=500)
+    database_prepared_statement_cache_size: int = Field(default=100)
+
     postgres_db: str
     postgres_host: str = Field(default="localhost")
     postgres_port: int = Field(default=5432)
@@ -28,6 +48,30 @@ class Settings(BaseSettings):
     supportive_phrases_path: str = Field(default="../phrases/supportive.json")
     user_supportive_phrases_path: str = Field(default="../phrases/user_supportive.json")
 
+    stats_flush_interval: float = Field(default=60)
+    stats_top_limit: int = Field(default=10)
+
+    rate_limit_user_capacity: float = Field(default=5)
+    rate_limit_user_rate: float = Field(default=0.2)
+    rate_limit_chat_capacity: float = Field(default=20)
+    rate_limit_chat_rate: float = Field(default=1)
+
+    profile_default_seconds: float = Field(default=30)
+    profile_max_seconds: float = Field(default=300)
+    profile_slow_callback_duration: float = Field(default=0.1)
+    profile_summary_length: int = Field(default=1500)
+
+    search_page_size: int = Field(default=10)
+    search_results_cache_size: int = Field(default=256)
+    search_results_cache_ttl: float = Field(default=900)
+
+    inline_cache_time: int = Field(default=300)
+    inline_page_size: int = Field(default=20)
+    inline_latency_budget: float = Field(default=0.05)
+    inline_max_results: int = Field(default=200)
+    inline_results_cache_size: int = Field(default=1024)
+    inline_results_cache_ttl: float = Field(default=600)
+
     @property
     def database_settings(self) -> Any:
         """
@@ -46,6 +90,8 @@ class Settings(BaseSettings):
         """
         Get uri for connection with database.
         """
+        if self.database_backend == "sqlite":
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
         return "postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}".format(
             **self.database_settings,
         )
@@ -0,0 +1,37 @@
+import asyncio
+import socket
+
+import httpx
+from settings import Settings
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+
+def build_request(settings: Settings, connection_pool_size: int) -> HTTPXRequest:
+    """
+    Build a request with its own connection pool. Idle connections are kept open for
+    `telegram_keepalive_expiry` seconds with TCP keep-alive, so that sends after a quiet period
+    don't pay for a new handshake.
+    """
+    # httpx ignores client limits when a transport is passed, so the limits are set on the transport itself
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=connection_pool_size,
+            max_keepalive_connections=connection_pool_size,
+            keepalive_expiry=settings.telegram_keepalive_expiry,
+        ),
+        socket_options=[(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+    )
+    return HTTPXRequest(
+        connection_pool_size=connection_pool_size,
+        read_timeout=settings.telegram_read_timeout,
+        write_timeout=settings.telegram_write_timeout,
+        connect_timeout=settings.telegram_connect_timeout,
+        pool_timeout=settings.telegram_pool_timeout,
+        httpx_kwargs={"transport": transport},
+    )
+
+
+async def warm_up(bot: Bot, connections: int) -> None:
+    """Open up to `connections` pooled connections with concurrent lightweight requests."""
+    await asyncio.gather(*(bot.get_me() for _ in range(connections)))
@@ -23,6 +23,9 @@ HELP_TEXT = """Доступные команды:
 /menu название (или /add_recipe) - отправить меню в канал
 /show_menu - показать ссылку на меню
 /search_recipe название - поиск рецепта по названию
+@бот название - поиск рецепта прямо при вводе
+/stats - твоя статистика сообщений
+/top [дней] - самые активные участники
 /ping - пинг бота
 """
 
@@ -1,5 +1,12 @@
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
 import pandas as pd
 
+K = TypeVar("K")
+V = TypeVar("V")
+
 
 async def update_table(gdrive_id: str, sheet_name: str) -> pd.DataFrame:
     """Update the table from Google Drive."""
@@ -12,3 +19,37 @@ def escape_markdown(text: str) -> str:
     """https://core.telegram.org/bots/api#markdownv2-style"""
     escape_chars = r"_*[]()~`>#-|{}.!+="
     return "".join(f"\\{char}" if char in escape_chars else char for char in text)
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Small LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,7 +1,21 @@
 # https://api.telegram.org/bot
 
-import pytest
-from telegram.ext import Application
+import asyncio
+import os
+
+# repository tests run on the in-memory SQLite backend, these have to be set before settings are imported
+os.environ["DATABASE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = ":memory:"
+# SQL logging would drown the output
+os.environ["DATABASE_ECHO"] = "false"
+for name in ["TOKEN", "SHEET_ID", "SHEET_NAME", "OPENAI_API_KEY", "POSTGRES_DB", "POSTGRES_USER", "POSTGRES_PASSWORD"]:
+    os.environ.setdefault(name, "test")
+for name in ["CHAT_ID", "ADMIN_CHAT_ID", "MENU_CHANNEL_ID"]:
+    os.environ.setdefault(name, "0")
+
+import pytest  # noqa: E402
+from database import SessionManager  # noqa: E402
+from telegram.ext import Application  # noqa: E402
 
 
 @pytest.fixture(scope="session")  # fixture runs Bot app only once for entire tess session
@@ -18,3 +32,17 @@ async def application():
     await app.updater.stop()
     await app.stop()
     await app.shutdown()
+
+
+@pytest.fixture
+def run():
+    """
+    Runs coroutines on one event loop against a fresh in-memory database.
+    """
+    loop = asyncio.new_event_loop()
+    SessionManager().refresh()
+
+    yield loop.run_until_complete
+
+    loop.run_until_complete(SessionManager().engine.dispose())
+    loop.close()
@@ -0,0 +1,76 @@
+from rate_limit import RateLimiter, TokenBucket, parse_command
+
+
+def make_limiter(max_buckets: int = 10_000) -> RateLimiter:
+    limiter = RateLimiter(user_capacity=2, user_rate=1, chat_capacity=3, chat_rate=0.5, max_buckets=max_buckets)
+    limiter.commands = {"search_recipe", "menu"}
+    return limiter
+
+
+def test_bucket_refill_is_capped():
+    bucket = TokenBucket(capacity=2, rate=1, now=0)
+    assert bucket.consume(now=0)
+    assert bucket.consume(now=0)
+    assert not bucket.consume(now=0)
+
+    # an hour of idling refills only up to the capacity
+    assert bucket.consume(now=3600)
+    assert bucket.consume(now=3600)
+    assert not bucket.consume(now=3600)
+
+
+def test_user_bucket():
+    limiter = make_limiter()
+
+    assert limiter.allow("menu", user_id=1, chat_id=10, now=0)
+    assert limiter.allow("menu", user_id=1, chat_id=10, now=0)
+    assert not limiter.allow("menu", user_id=1, chat_id=10, now=0)
+    assert limiter.allow("menu", user_id=1, chat_id=10, now=1)
+    assert limiter.rejections == {("menu", "user"): 1}
+
+
+def test_chat_rejection_refunds_user_token():
+    limiter = make_limiter()
+    for user_id in (1, 2, 3):
+        assert limiter.allow("menu", user_id=user_id, chat_id=10, now=0)
+
+    assert not limiter.allow("menu", user_id=4, chat_id=10, now=0)
+    assert limiter.rejections == {("menu", "chat"): 1}
+    # user 4 still has both tokens once the chat bucket refills
+    assert limiter.allow("menu", user_id=4, chat_id=10, now=2)
+    assert limiter.allow("menu", user_id=4, chat_id=11, now=2)
+
+
+def test_unknown_commands_are_not_limited():
+    limiter = make_limiter()
+
+    assert all(limiter.allow("ping", user_id=1, chat_id=10, now=0) for _ in range(100))
+    assert limiter.rejections == {}
+
+
+def test_idle_buckets_are_dropped():
+    limiter = make_limiter(max_buckets=2)
+    limiter.allow("menu", user_id=1, chat_id=10, now=0)
+    limiter.allow("menu", user_id=2, chat_id=10, now=0)
+
+    # both user buckets are full again, so they are dropped to make room
+    limiter.allow("menu", user_id=3, chat_id=10, now=10)
+
+    assert set(limiter._user_buckets) == {3}
+
+
+def test_busy_buckets_are_kept():
+    limiter = make_limiter(max_buckets=2)
+    limiter.allow("menu", user_id=1, chat_id=10, now=0)
+    limiter.allow("menu", user_id=2, chat_id=10, now=0)
+
+    limiter.allow("menu", user_id=3, chat_id=10, now=0.5)
+
+    assert set(limiter._user_buckets) == {1, 2, 3}
+
+
+def test_parse_command():
+    assert parse_command("/search_recipe борщ", "podval_bot") == "search_recipe"
+    assert parse_command("/Menu", "podval_bot") == "menu"
+    assert parse_command("/menu@Podval_Bot суп", "podval_bot") == "menu"
+    assert parse_command("/menu@other_bot", "podval_bot") is None
@@ -0,0 +1,50 @@
+from database import Recipes
+from recipe_index import RecipeIndex
+
+BUDGET = 1.0
+
+
+def make_index(names: list[str]) -> RecipeIndex:
+    index = RecipeIndex(max_results=50, cache_size=16, cache_ttl=60)
+    for i, name in enumerate(names):
+        index.add(Recipes(id=i, name=name, link=f"https://t.me/c/1/{i}"))
+    return index
+
+
+def names(recipes: list[Recipes]) -> list[str]:
+    return [recipe.name for recipe in recipes]
+
+
+def test_ranking():
+    index = make_index(["суп борщевик", "холодный борщ", "пирог", "борщ", "щиборщи", "борщ зеленый"])
+
+    # exact prefix, then word prefix, then substring, each group in name order
+    assert names(index.search("борщ", BUDGET)) == ["борщ", "борщ зеленый", "суп борщевик", "холодный борщ", "щиборщи"]
+
+
+def test_fuzzy_fallback():
+    index = make_index(["борщ", "гороховый суп", "пирог"])
+
+    assert names(index.search("борш", BUDGET)) == ["борщ"]
+    assert index.search("xyz", BUDGET) == []
+
+
+def test_case_insensitive():
+    index = make_index(["Борщ Украинский", "пирог"])
+
+    assert names(index.search("борщ укр", BUDGET)) == ["Борщ Украинский"]
+    assert names(index.search("  БОРЩ  ", BUDGET)) == ["Борщ Украинский"]
+
+
+def test_add_keeps_index_sorted():
+    index = make_index(["суп", "борщ"])
+    assert names(index.search("с", BUDGET)) == ["суп"]
+
+    index.add(Recipes(id=10, name="Салат", link="https://t.me/c/1/10"))
+
+    assert names(index.search("с", BUDGET)) == ["Салат", "суп"]
+    assert len(index) == 3
+
+
+def test_empty_query():
+    assert make_index(["борщ"]).search("   ", BUDGET) == []
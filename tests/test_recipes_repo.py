@@ -0,0 +1,33 @@
+from database import Recipes
+from repository import RecipiesRepo
+
+
+def test_search_recipe_by_name(run):
+    run(
+        RecipiesRepo.add_recipes(
+            [
+                Recipes(name="борщ", link="https://t.me/c/1/1"),
+                Recipes(name="холодный борщ", link="https://t.me/c/1/2"),
+                Recipes(name="гороховый суп", link="https://t.me/c/1/3"),
+            ]
+        )
+    )
+
+    recipes = run(RecipiesRepo.search_recipe_by_name("Борщ"))
+
+    assert sorted(recipe.name for recipe in recipes) == ["борщ", "холодный борщ"]
+    assert run(RecipiesRepo.search_recipe_by_name("пирог")) == []
+
+
+def test_count_recipes(run):
+    assert run(RecipiesRepo.count_recipes()) == 0
+    run(RecipiesRepo.add_recipe("борщ", "https://t.me/c/1/1"))
+    assert run(RecipiesRepo.count_recipes()) == 1
+
+
+def test_search_recipe_by_name_ignores_case(run):
+    run(RecipiesRepo.add_recipe("Борщ Украинский", "https://t.me/c/1/1"))
+
+    recipes = run(RecipiesRepo.search_recipe_by_name("борщ укр"))
+
+    assert [recipe.name for recipe in recipes] == ["Борщ Украинский"]
@@ -0,0 +1,43 @@
+from datetime import date
+
+from repository import StatsRepo
+
+CHAT_ID = -100
+
+
+def test_add_message_counts_upserts(run):
+    run(StatsRepo.add_message_counts({(CHAT_ID, 1, date(2024, 1, 1)): 3}, {1: "Анна"}))
+    run(
+        StatsRepo.add_message_counts(
+            {(CHAT_ID, 1, date(2024, 1, 1)): 2, (CHAT_ID, 1, date(2024, 1, 2)): 4},
+            {1: "Анна"},
+        )
+    )
+
+    assert run(StatsRepo.get_user_stats(CHAT_ID, 1, date(2024, 1, 1))) == (5, 9)
+    assert run(StatsRepo.get_user_stats(CHAT_ID, 1, date(2024, 1, 3))) == (0, 9)
+
+
+def test_get_user_stats_without_messages(run):
+    assert run(StatsRepo.get_user_stats(CHAT_ID, 1, date(2024, 1, 1))) == (0, 0)
+
+
+def test_get_top_chatters(run):
+    run(
+        StatsRepo.add_message_counts(
+            {
+                (CHAT_ID, 1, date(2024, 1, 1)): 3,
+                (CHAT_ID, 2, date(2024, 1, 1)): 1,
+                (CHAT_ID, 3, date(2023, 12, 1)): 100,
+                (-200, 4, date(2024, 1, 1)): 50,
+            },
+            {1: "Zoe", 2: "Борис", 3: "Вера", 4: "Глеб"},
+        )
+    )
+    # renamed later, the latest name is shown
+    run(StatsRepo.add_message_counts({(CHAT_ID, 1, date(2024, 1, 2)): 2}, {1: "Anna"}))
+
+    top = run(StatsRepo.get_top_chatters(CHAT_ID, date(2024, 1, 1), 10))
+
+    assert top == [("Anna", 5), ("Борис", 1)]
+    assert run(StatsRepo.get_top_chatters(CHAT_ID, date(2024, 1, 1), 1)) == [("Anna", 5)]
@@ -0,0 +1,23 @@
+from datetime import date, datetime
+
+from repository import UserRepo
+
+
+def test_get_users_with_birthday(run):
+    run(
+        UserRepo.create_users(
+            ["@anna", "@boris", "@vera"],
+            ["Анна", "Борис", "Вера"],
+            [date(1990, 3, 16), date(1995, 3, 17), date(1988, 4, 16)],
+        )
+    )
+
+    users = run(UserRepo.get_users_with_birthday(datetime(2024, 3, 16)))
+
+    assert [user.username for user in users] == ["@anna"]
+
+
+def test_get_users_with_birthday_no_matches(run):
+    run(UserRepo.create_users(["@anna"], ["Анна"], [date(1990, 3, 16)]))
+
+    assert run(UserRepo.get_users_with_birthday(datetime(2024, 1, 1))) == []